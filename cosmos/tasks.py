@@ -1,14 +1,43 @@
+import hashlib
+import inspect
 import json
 import os
+import shlex
 import shutil
+import subprocess
 import sys
-from functools import wraps
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache, wraps
+from pathlib import Path
 
-from invoke import task, Collection, Context
+from invoke import task, Collection, Context, Exit
 
 # Get the current Python version
 CURRENT_PYTHON_VERSION = f"{sys.version_info.major}.{sys.version_info.minor}"
 
+# Virtualenv cache, keyed by python version and poetry.lock content
+VENV_CACHE_DIR = os.path.expanduser("~/.venv/cache")
+VENV_CACHE_MAX_ENTRIES = 10
+VENV_CACHE_FREE_SPACE_THRESHOLD_GB = 2.0
+# Prebuilt wheels of the locked dependencies, keyed by python version and pins
+WHEELHOUSE_DIR = ".wheels"
+
+# Stamp holding the python version the virtualenv was created with
+VENV_VERSION_STAMP = ".cosmos-stamp"
+
+# Stamp holding the poetry.lock hash the virtualenv dependencies were installed from
+VENV_LOCK_STAMP = ".cosmos-lock-hash"
+
+# Trees with fewer entries are removed without the thread pool
+PARALLEL_RMTREE_MIN_ENTRIES = 100
+
+# Serializes terminal output of concurrently running commands
+OUTPUT_LOCK = threading.Lock()
+
+# Names of tasks already run by run_task_graph in this process
+COMPLETED_TASKS = set()
+
 #################################################################################
 ####  Cosmos Setup  ####
 #################################################################################
@@ -21,24 +50,140 @@ def get_venv_name():
     return f"~/.venv/sandbox_py{CURRENT_PYTHON_VERSION.replace('.', '')}"
 
 
+def get_lock_hash():
+    """
+    Hash the content of poetry.lock.
+    """
+    with open("poetry.lock", "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def get_venv_cache_path(python_version=CURRENT_PYTHON_VERSION):
+    """
+    Locate the cached virtual environment matching the python version and poetry.lock.
+    """
+    key = hashlib.sha256((get_lock_hash() + python_version).encode()).hexdigest()[:16]
+    return os.path.join(VENV_CACHE_DIR, key)
+
+
+def is_venv_cached(python_version=CURRENT_PYTHON_VERSION):
+    """
+    Check if the cached virtual environment has dependencies installed from the current
+    poetry.lock and can be reused.
+    """
+    stamp = os.path.join(get_venv_cache_path(python_version), VENV_LOCK_STAMP)
+    if not os.path.isfile(stamp):
+        return False
+    with open(stamp, "r") as f:
+        return f.read().strip() == get_lock_hash()
+
+
+def is_venv_valid(python_version=CURRENT_PYTHON_VERSION):
+    """
+    Check if the sandbox virtual environment already points at the cached environment
+    for this python version and poetry.lock, and its interpreter works.
+    """
+    venv_path = os.path.expanduser(get_venv_name())
+    cache_path = get_venv_cache_path(python_version)
+    if os.path.realpath(venv_path) != os.path.realpath(cache_path):
+        return False
+
+    stamp = os.path.join(venv_path, VENV_VERSION_STAMP)
+    if not os.path.isfile(stamp):
+        return False
+    with open(stamp, "r") as f:
+        if f.read().strip() != python_version:
+            return False
+
+    return is_interpreter_working(venv_path)
+
+
+def is_interpreter_working(venv_path):
+    """
+    Check if the interpreter of a virtual environment exists and starts.
+    """
+    venv_python = os.path.join(venv_path, "bin", "python")
+    if not os.path.isfile(venv_python):
+        return False
+    result = subprocess.run([venv_python, "-c", "import sys"], check=False)
+    return result.returncode == 0
+
+
+def evict_venv_cache(keep):
+    """
+    Evict least recently used cached virtual environments, when the cache holds too many
+    entries or the disk is running out of free space.
+    """
+    if not os.path.isdir(VENV_CACHE_DIR):
+        return
+
+    entries = [
+        entry.path
+        for entry in os.scandir(VENV_CACHE_DIR)
+        if entry.is_dir(follow_symlinks=False) and entry.path != keep
+    ]
+    # Oldest first; the entry is touched on every cache hit
+    entries.sort(key=lambda path: os.stat(path).st_mtime)
+
+    def low_on_space():
+        free_gb = shutil.disk_usage(VENV_CACHE_DIR).free / 1024**3
+        return free_gb < VENV_CACHE_FREE_SPACE_THRESHOLD_GB
+
+    while entries and (len(entries) >= VENV_CACHE_MAX_ENTRIES or low_on_space()):
+        path = entries.pop(0)
+        shutil.rmtree(path, ignore_errors=True)
+        print(f"Evicted cached virtualenv '{path}'.")
+
+
+def get_poetry_groups(project_dir):
+    """
+    List the non-optional dependency groups declared in a project's pyproject.toml,
+    i.e. the groups a plain `poetry install` would install.
+    """
+    # tomli is only needed before python 3.11, and black/pytest already pull it in there
+    if sys.version_info >= (3, 11):
+        import tomllib
+    else:
+        import tomli as tomllib
+
+    with open(os.path.join(project_dir, "pyproject.toml"), "rb") as f:
+        poetry = tomllib.load(f).get("tool", {}).get("poetry", {})
+
+    groups = ["dev"] if "dev-dependencies" in poetry else []
+    for name, group in poetry.get("group", {}).items():
+        if not group.get("optional", False) and name not in groups:
+            groups.append(name)
+    return groups
+
+
 def is_venv_active():
     """
-    Check if a virtual environment is active.
+    Check if the sandbox virtual environment is the active one.
     """
-    return os.environ.get("VIRTUAL_ENV") is not None
+    active_venv = os.environ.get("VIRTUAL_ENV")
+    if active_venv is None:
+        return False
+    sandbox = os.path.expanduser(get_venv_name())
+    return os.path.realpath(active_venv) == os.path.realpath(sandbox)
 
 
-def get_activate_cmd(ctx, python_version=CURRENT_PYTHON_VERSION):
+# The activation state cannot change for the lifetime of the process
+VENV_ACTIVE = is_venv_active()
+
+
+def get_venv_env():
     """
-    Print instructions to activate the virtual environment in the current shell.
+    Environment variables equivalent to sourcing the virtual environment activate
+    script.
     """
-    venv_name = get_venv_name()
-    activate_script = "bin/activate" if os.name != "nt" else "Scripts/activate"
-    activate_path = os.path.join(venv_name, activate_script)
+    venv_path = os.path.expanduser(get_venv_name())
+    bin_dir = "bin" if os.name != "nt" else "Scripts"
+    path = os.path.join(venv_path, bin_dir) + os.pathsep + os.environ.get("PATH", "")
+    return {"VIRTUAL_ENV": venv_path, "PATH": path}
 
-    # Optional: Prompt the user to run the command
-    print(f"Activating virtualenv: source {activate_path}")
-    return f"source {activate_path}"
+
+# Activation is applied through the run environment, activate is never sourced
+VENV_ENV = get_venv_env()
 
 
 def with_venv(func):
@@ -48,63 +193,208 @@ def with_venv(func):
 
     @wraps(func)
     def wrapper(ctx, *args, **kwargs):
-        if not is_venv_active():
-            activate_cmd = get_activate_cmd(ctx)
-            with ctx.prefix(activate_cmd):
-                return func(ctx, *args, **kwargs)
+        # Only skip when the sandbox itself is active, not any other virtualenv
+        if VENV_ACTIVE:
+            return func(ctx, *args, **kwargs)
+        # Apply the activation environment instead of sourcing activate per command
+        env = dict(ctx.config.run.env)
+        ctx.config.run.env = {**env, **VENV_ENV}
+        try:
+            return func(ctx, *args, **kwargs)
+        finally:
+            ctx.config.run.env = env
 
     return wrapper
 
 
+def get_task_levels(graph):
+    """
+    Group the tasks of a dependency graph into execution levels (Kahn's algorithm).
+    Tasks in the same level have no dependency on each other.
+    """
+    indegree = {node: len(deps) for node, deps in graph.items()}
+    dependents = {node: [] for node in graph}
+    for node, deps in graph.items():
+        for dep in deps:
+            dependents[dep].append(node)
+
+    levels = []
+    ready = [node for node, degree in indegree.items() if degree == 0]
+    while ready:
+        levels.append(ready)
+        next_ready = []
+        for node in ready:
+            for dependent in dependents[node]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    next_ready.append(dependent)
+        ready = next_ready
+
+    if sum(len(level) for level in levels) != len(graph):
+        raise ValueError("Task graph contains a cycle.")
+    return levels
+
+
+def get_task_graph(*targets):
+    """
+    Collect the dependency graph of the given tasks from their pre tasks.
+    """
+    graph = {}
+    pending = list(targets)
+    while pending:
+        node = pending.pop()
+        if node not in graph:
+            graph[node] = list(node.pre)
+            pending.extend(node.pre)
+    return graph
+
+
+def run_task_graph(ctx, graph, **kwargs):
+    """
+    Run a task dependency graph level by level, executing independent tasks
+    concurrently.
+    Keyword arguments are forwarded to the tasks that accept them.
+    Tasks already completed in this process are not run again.
+    """
+    for level in get_task_levels(graph):
+        level = [node for node in level if node.name not in COMPLETED_TASKS]
+        if not level:
+            continue
+        print(f"Running tasks: {', '.join(node.name for node in level)}")
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = {}
+            for node in level:
+                params = inspect.signature(node.body).parameters
+                node_kwargs = {k: v for k, v in kwargs.items() if k in params}
+                # Each task gets its own context and config, so ctx.cd and run.env
+                # changes do not leak across threads
+                futures[node] = executor.submit(
+                    node, Context(config=ctx.config.clone()), **node_kwargs
+                )
+            # Wait for the whole level before advancing, re-raising any failure
+            for node, future in futures.items():
+                future.result()
+                COMPLETED_TASKS.add(node.name)
+
+
+@lru_cache(maxsize=1)
 def load_config():
-    """Load project configuration from config.json."""
-    with open("repositories.json", "r") as f:
-        config = json.load(f)
+    """Load project configuration from repositories.json, parsed once per process."""
+    config = json.loads(Path("repositories.json").read_text())
     return config["projects"]
 
 
 @task
 def create_env(ctx, python_version=CURRENT_PYTHON_VERSION):
     """
-    Create a virtual environment.
+    Create a virtual environment with Poetry installed and configured.
     """
-    # Create virtualenv
     venv_name = get_venv_name()
-    ctx.run(f"python{python_version} -m venv {venv_name}")
-    print(f"Virtualenv '{venv_name}' created.")
+    venv_path = os.path.expanduser(venv_name)
+    cache_path = get_venv_cache_path(python_version)
+
+    if is_venv_valid(python_version):
+        os.utime(cache_path)
+        print(f"Virtualenv '{venv_name}' already exists.")
+        return
+
+    # A cache entry whose interpreter no longer starts (e.g. the base python was
+    # reinstalled) is rebuilt instead of relinked
+    if is_venv_cached(python_version) and is_interpreter_working(cache_path):
+        # Refresh the entry for LRU eviction
+        os.utime(cache_path)
+        print(f"Reusing cached virtualenv '{cache_path}'.")
+    else:
+        # Create virtualenv in place inside the cache, as venvs are not relocatable;
+        # install_deps stamps it once dependencies are installed
+        evict_venv_cache(keep=cache_path)
+        # Create the venv, install and configure Poetry in a single shell
+        bin_dir = os.path.join(cache_path, "bin")
+        ctx.run(
+            f"python{python_version} -m venv --clear --upgrade-deps {cache_path} && "
+            f"{bin_dir}/pip install poetry poetry-plugin-export && "
+            f"{bin_dir}/poetry config virtualenvs.create false",
+            shell="/bin/bash",
+        )
+        with open(os.path.join(cache_path, VENV_VERSION_STAMP), "w") as f:
+            f.write(python_version)
+        print(f"Virtualenv '{cache_path}' created.")
+
+    # Point the sandbox venv name at the cached environment
+    if os.path.islink(venv_path):
+        os.unlink(venv_path)
+    elif os.path.isdir(venv_path):
+        shutil.rmtree(venv_path)
+    os.symlink(cache_path, venv_path)
+    print(f"Virtualenv '{venv_name}' linked to '{cache_path}'.")
 
 
 @task(pre=[create_env])
 @with_venv
-def configure_poetry(ctx, python_version=CURRENT_PYTHON_VERSION):
-    """
-    Install Poetry and configure it to automatically accept licenses.
-    """
-    # Install Poetry
-    ctx.run(f"python{python_version} -m pip install poetry")
-    # Configure Poetry to automatically accept licenses
-    ctx.run("poetry config virtualenvs.create false")
-    print("Poetry installed and configured to automatically accept licenses.")
-
-
-@task(pre=[create_env, configure_poetry])
-@with_venv
-def install_deps(ctx):
+def install_deps(ctx, python_version=CURRENT_PYTHON_VERSION, monorepo=False):
     """
     Install project dependencies using Poetry.
+    With monorepo, Quark and its dependencies are installed in the same pip invocation.
     """
-    # Install dependencies
-    ctx.run("poetry install --no-root")
+    if is_venv_cached(python_version) and not monorepo:
+        print("Project dependencies already installed in cached virtualenv.")
+        return
+    if monorepo and not os.path.isdir("Quark"):
+        raise Exit("Quark project not found, run pull-quark first.")
+
+    # Install the pins resolved in poetry.lock directly, skipping Poetry's resolver
+    # Use the sandbox binaries explicitly, so nothing lands in another active venv
+    cache_path = get_venv_cache_path(python_version)
+    bin_dir = os.path.join(cache_path, "bin")
+    export_cmd = f"{bin_dir}/poetry export -f requirements.txt --without-hashes"
+    requirement_files = [os.path.join(cache_path, "requirements.txt")]
+    ctx.run(f"{export_cmd} --with dev -o {requirement_files[0]}")
+    if monorepo:
+        # Export only the groups Quark declares, as Poetry rejects unknown groups
+        requirement_files.append(os.path.join(cache_path, "quark-requirements.txt"))
+        groups = get_poetry_groups("Quark")
+        with_groups = f" --with {','.join(groups)}" if groups else ""
+        ctx.run(f"(cd Quark && {export_cmd}{with_groups} -o {requirement_files[1]})")
+    requirement_args = " ".join(f"-r {file}" for file in requirement_files)
+
+    # Build the wheels once per python version and pins, then install offline from them
+    key = hashlib.sha256(python_version.encode())
+    for file in requirement_files:
+        key.update(Path(file).read_bytes())
+    wheelhouse = os.path.join(WHEELHOUSE_DIR, key.hexdigest()[:16])
+    if os.path.isdir(wheelhouse):
+        print(f"Reusing wheelhouse '{wheelhouse}'.")
+    else:
+        # Build into a temporary directory so an interrupted build is never reused;
+        # editable Quark needs its build backend available offline too
+        building = f"{wheelhouse}.tmp"
+        shutil.rmtree(building, ignore_errors=True)
+        build_deps = " poetry-core" if monorepo else ""
+        ctx.run(
+            f"{bin_dir}/python -m pip wheel --no-deps --wheel-dir {building} "
+            f"{requirement_args}{build_deps}",
+        )
+        os.rename(building, wheelhouse)
+
+    editable = " -e Quark" if monorepo else ""
+    ctx.run(
+        f"{bin_dir}/python -m pip install --no-deps --require-virtualenv --no-index "
+        f"--find-links {wheelhouse} {requirement_args}{editable}",
+    )
+    # Stamp the lock hash so later runs can reuse the cached virtualenv
+    with open(os.path.join(cache_path, VENV_LOCK_STAMP), "w") as f:
+        f.write(get_lock_hash())
     print("Project dependencies installed.")
 
 
 # First entry for easy-to-start
-@task(pre=[create_env, configure_poetry, install_deps])
+@task
 def bootstrap(ctx, python_version=CURRENT_PYTHON_VERSION):
     """
     Run all bootstrap tasks: create virtualenv, configure Poetry, and install dependencies.
     """
-    pass
+    create_env(ctx, python_version=python_version)
+    install_deps(ctx, python_version=python_version)
 
 
 #################################################################################
@@ -118,34 +408,114 @@ def format(ctx):
     """
     Format the code using black and isort.
     """
-    venv_name = get_venv_name()
-    activate_cmd = get_activate_cmd(ctx)
-
-    # excluding rule weirdly fails with decorator here, use ctx.prefix to workaround
     with ctx.cd("."):
         print("Formatting code...")
         ctx.run("black .")
         ctx.run("isort .")
 
 
+def get_worker_count(minimum=1):
+    """
+    Size of worker pools for concurrent I/O-bound operations: 3/4 of the available CPUs.
+    """
+    return max(minimum, (os.cpu_count() * 3) // 4)
+
+
+def parallel_rmtree(path, executor):
+    """
+    Remove a directory tree, unlinking the files of each directory concurrently.
+    Small trees are removed with shutil.rmtree to avoid the pool overhead.
+    """
+    files_by_dir = {}
+    pending = [path]
+    while pending:
+        current = pending.pop()
+        files_by_dir[current] = []
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                else:
+                    files_by_dir[current].append(entry.path)
+
+    entry_count = len(files_by_dir) + sum(map(len, files_by_dir.values()))
+    if entry_count < PARALLEL_RMTREE_MIN_ENTRIES:
+        shutil.rmtree(path)
+        return
+
+    def unlink_all(files):
+        for file in files:
+            os.unlink(file)
+
+    futures = [executor.submit(unlink_all, files) for files in files_by_dir.values()]
+    for future in futures:
+        future.result()
+    # Directories were discovered parents first, so remove them in reverse order
+    for directory in reversed(list(files_by_dir)):
+        os.rmdir(directory)
+
+
 @task
-def clean(ctx):
+def clean(ctx, cache=False):
     """
     Clean up the virtual environment and temporary files.
+    Use --cache to also purge the cached virtualenvs and the wheelhouse.
     """
     venv_name = get_venv_name()
     print("Cleaning up...")
 
-    # Remove virtual environment
-    if os.path.exists(venv_name):
-        shutil.rmtree(venv_name)
-        print(f"Removed virtual environment '{venv_name}'.")
+    with ThreadPoolExecutor(max_workers=get_worker_count(minimum=4)) as executor:
+        # Remove virtual environment link, cached environments are kept unless purged
+        venv_path = os.path.expanduser(venv_name)
+        if os.path.islink(venv_path):
+            os.unlink(venv_path)
+            print(f"Removed virtual environment '{venv_name}'.")
+        elif os.path.exists(venv_path):
+            parallel_rmtree(venv_path, executor)
+            print(f"Removed virtual environment '{venv_name}'.")
+
+        if cache:
+            for cache_dir in (VENV_CACHE_DIR, WHEELHOUSE_DIR):
+                if os.path.isdir(cache_dir):
+                    parallel_rmtree(cache_dir, executor)
+                    print(f"Removed cache '{cache_dir}'.")
+
+        # Remove other temporary files in-process; *.pyc files inside an already
+        # removed __pycache__ no longer exist and are skipped
+        cwd = Path(".")
+        temp_paths = [cwd / "build", cwd / "dist", *cwd.glob("*.egg-info")]
+        temp_paths += list(cwd.rglob("__pycache__"))
+        for path in temp_paths + list(cwd.rglob("*.pyc")):
+            if path.is_dir() and not path.is_symlink():
+                parallel_rmtree(str(path), executor)
+            elif path.exists() or path.is_symlink():
+                path.unlink()
+    print("Removed build, dist, *.egg-info, __pycache__, *.pyc.")
+
+
+def get_commit_push_cmd(project_dir, m):
+    """
+    Chain git add, git commit, and git push for a repository into a single shell
+    command.
+    """
+    git = f"git -C {shlex.quote(project_dir)}"
+    # A repository with nothing staged is not a failure, it is simply not committed
+    commit = f"({git} diff --cached --quiet || {git} commit -m {shlex.quote(m)})"
+    return f"{git} add . && {commit} && {git} push"
+
 
-    # Remove other temporary files
-    temp_files = ["build", "dist", "*.egg-info", "__pycache__", "*.pyc"]
-    for pattern in temp_files:
-        ctx.run(f"rm -rf {pattern}")
-        print(f"Removed {pattern}.")
+def commit_push(ctx, project_name, project_dir, m):
+    """
+    Commit and push a single repository, printing its output in one block.
+    """
+    result = ctx.run(
+        get_commit_push_cmd(project_dir, m), shell="/bin/bash", hide=True, warn=True
+    )
+    with OUTPUT_LOCK:
+        print(f"Committing changes in {project_name}...")
+        print(result.stdout, end="")
+        print(result.stderr, end="", file=sys.stderr)
+    return result.ok
 
 
 @task
@@ -158,25 +528,66 @@ def group_commit(ctx, m):
     cosmos_dir = "."
     projects = load_config()
 
-    # Perform git operations for Cosmos
-    print("Committing changes in Cosmos...")
-    with ctx.cd(cosmos_dir):
-        ctx.run("git add .")
-        ctx.run(f'git commit -m "{m}"')
-        ctx.run("git push")
+    # Perform git operations for subprojects concurrently
+    with ThreadPoolExecutor(max_workers=get_worker_count()) as executor:
+        futures = {
+            project["name"]: executor.submit(
+                commit_push, ctx, project["name"], os.path.join(".", project["name"]), m
+            )
+            for project in projects
+        }
+        wait(futures.values())
+
+    failed = [name for name, future in futures.items() if not future.result()]
+    if failed:
+        raise Exit(f"Group commit failed in: {', '.join(failed)}")
+
+    # Perform git operations for Cosmos last, so it records the subprojects' new commits
+    if not commit_push(ctx, "Cosmos", cosmos_dir, m):
+        raise Exit("Group commit failed in: Cosmos")
+    print("Group commit and push completed successfully!")
 
-    # Perform git operations for subprojects
-    for project in projects:
-        project_name = project["name"]
-        project_dir = os.path.join(".", project_name)
 
-        print(f"Committing changes in {project_name}...")
-        with ctx.cd(project_dir):
-            ctx.run("git add .")
-            ctx.run(f'git commit -m "{m}"')
-            ctx.run("git push")
+def clone_if_missing(ctx, project):
+    """
+    Shallow clone a project from repositories.json, unless it already exists.
+    """
+    project_name = project["name"]
+    if os.path.exists(project_name):
+        with OUTPUT_LOCK:
+            print(f"{project_name} project already exists.")
+        return True
+
+    result = ctx.run(
+        f"git clone --depth=1 --filter=blob:none "
+        f"{shlex.quote(project['ssh_url'])} {shlex.quote(project_name)}",
+        hide=True,
+        warn=True,
+    )
+    status = "cloned" if result.ok else "failed to clone"
+    with OUTPUT_LOCK:
+        print(result.stderr, end="", file=sys.stderr)
+        print(f"{project_name} project {status}.")
+    return result.ok
 
-    print("Group commit and push completed successfully!")
+
+@task
+def pull_all(ctx):
+    """
+    Clone all projects listed in repositories.json concurrently.
+    """
+    projects = load_config()
+    with ThreadPoolExecutor(max_workers=get_worker_count()) as executor:
+        futures = {
+            project["name"]: executor.submit(clone_if_missing, ctx, project)
+            for project in projects
+        }
+        wait(futures.values())
+
+    failed = [name for name, future in futures.items() if not future.result()]
+    if failed:
+        raise Exit(f"Clone failed for: {', '.join(failed)}")
+    print("All projects pulled.")
 
 
 #################################################################################
@@ -190,13 +601,19 @@ def pull_quark(ctx):
     Clone the Quark repository.
     """
     if not os.path.exists("Quark"):
-        ctx.run("git clone git@github.com:codes1gn/Quark.git")
+        # Shallow, blobless clone: only HEAD is needed to build and test, run
+        # `git fetch --unshallow` in Quark if the history is needed later
+        ctx.run(
+            "git clone --depth=1 --filter=blob:none --single-branch "
+            "git@github.com:codes1gn/Quark.git"
+        )
         print("Quark project cloned.")
     else:
         print("Quark project already exists.")
 
 
-@task
+@task(pre=[pull_quark, install_deps])
+@with_venv
 def build_quark(ctx):
     """
     Build the Quark project using Poetry, ensuring no new virtualenv is created.
@@ -206,7 +623,8 @@ def build_quark(ctx):
         print("Quark project built.")
 
 
-@task
+@task(pre=[build_quark])
+@with_venv
 def test_quark(ctx):
     """
     Run tests for the Quark project.
@@ -217,22 +635,30 @@ def test_quark(ctx):
 
 
 @task
-@with_venv
-def build(ctx, python_version=CURRENT_PYTHON_VERSION):
+def build(ctx, python_version=CURRENT_PYTHON_VERSION, monorepo=False):
     """
     Execute all tasks: bootstrap (create virtualenv, configure Poetry, install dependencies),
     pull Quark, build Quark, and run tests.
+    Use --monorepo to install Cosmos and Quark dependencies in a single pip invocation.
     """
-    bootstrap(ctx, python_version=python_version)
-    pull_quark(ctx)
-    build_quark(ctx)
-    test_quark(ctx)
+    # The graph is derived from the pre tasks, so each task runs exactly once;
+    # pulling Quark does not depend on the virtualenv chain and overlaps with it
+    graph = get_task_graph(test_quark)
+    if monorepo:
+        # install_deps installs Quark in place of build_quark, so clone Quark first
+        graph[install_deps] = graph[install_deps] + [pull_quark]
+        del graph[build_quark]
+        graph[test_quark] = [install_deps]
+    run_task_graph(ctx, graph, python_version=python_version, monorepo=monorepo)
 
 # Create a namespace for the tasks
 namespace = Collection(
+    bootstrap,
+    build,
     format,
     clean,
     group_commit,
+    pull_all,
     pull_quark,
     build_quark,
     test_quark,